@@ -1,11 +1,16 @@
+import os
+
 import streamlit as st
+import numpy as np
 import pandas as pd
+import polars as pl
 import plotly.express as px
+import plotly.graph_objects as go
+from numba import njit
 import folium   # Renderizado del mapa
 from streamlit_folium import st_folium
 from datetime import datetime
-from folium.plugins import MarkerCluster
-from string import capwords
+from folium.plugins import FastMarkerCluster
 
 def obtener_color(ventas):
     if ventas > 1000000:  # Más de 1M
@@ -17,7 +22,48 @@ def obtener_color(ventas):
     else:                  # Menos de 100K
         return '#33cc33'  # Verde
 
+@njit(cache=True)
+def sumas_fusionadas(cat, seg, pago, mes, total, n_cat, n_seg, n_pago, n_mes):
+    """
+    Suma `total` por categoría, segmento, método de pago y mes (más el
+    conteo mensual) en una sola pasada sobre los códigos enteros de los
+    categoricals, en lugar de un groupby por cada dimensión.
+    """
+    suma_cat = np.zeros(n_cat)
+    suma_seg = np.zeros(n_seg)
+    suma_pago = np.zeros(n_pago)
+    suma_mes = np.zeros(n_mes)
+    conteo_mes = np.zeros(n_mes, dtype=np.int64)
+    for i in range(total.shape[0]):
+        valor = total[i]
+        suma_cat[cat[i]] += valor
+        suma_seg[seg[i]] += valor
+        suma_pago[pago[i]] += valor
+        suma_mes[mes[i]] += valor
+        conteo_mes[mes[i]] += 1
+    return suma_cat, suma_seg, suma_pago, suma_mes, conteo_mes
+
+# Conversión única de los CSV a Parquet para lecturas más rápidas
+def convertir_a_parquet():
+    """
+    Genera los archivos .parquet a partir de los CSV si aún no existen.
+    Parquet es columnar y comprimido, así que las cargas posteriores
+    solo leen las columnas necesarias.
+    """
+    conversiones = [
+        ('df_transacciones.csv', 'df_transacciones.parquet',
+         {'parse_dates': ['fecha'], 'dtype': {'producto_id': 'string', 'cliente_id': 'string'}}),
+        ('df_productos.csv', 'df_productos.parquet',
+         {'dtype': {'producto_id': 'string'}}),
+        ('df_clientes.csv', 'df_clientes.parquet',
+         {'dtype': {'cliente_id': 'string'}}),
+    ]
+    for ruta_csv, ruta_parquet, opciones in conversiones:
+        if not os.path.exists(ruta_parquet):
+            pd.read_csv(ruta_csv, **opciones).to_parquet(ruta_parquet, compression='zstd')
+
 # Función para la carga de datos
+@st.cache_data(show_spinner=False)
 def load_data():
     """
     Cargar y combinar los conjuntos de datos referentes a
@@ -26,14 +72,226 @@ def load_data():
     3. Información de clientes
     Retorna una tupla con los datos
     """
-    transacciones = pd.read_csv('df_transacciones.csv', parse_dates=['fecha'],dtype={'producto_id':'string', 'cliente_id':'string'})
-    productos = pd.read_csv('df_productos.csv', dtype={'cliente_id': 'string'})
-    clientes = pd.read_csv('df_clientes.csv', dtype={'cliente_id': 'string'})
+    convertir_a_parquet()
+
+    transacciones = pd.read_parquet(
+        'df_transacciones.parquet',
+        columns=['transaccion_id', 'cliente_id', 'producto_id', 'fecha', 'cantidad', 'total', 'metodo_pago']
+    )
+    productos = pd.read_parquet(
+        'df_productos.parquet',
+        columns=['producto_id', 'nombre', 'categoria']
+    )
+    clientes = pd.read_parquet(
+        'df_clientes.parquet',
+        columns=['cliente_id', 'nombre', 'apellido', 'email', 'ciudad', 'latitud', 'longitud', 'segmento']
+    )
+
+    # Tipos numéricos más angostos antes del merge: cada escaneo posterior
+    # (sumas, filtros, mapa) mueve la mitad de los bytes
+    transacciones['total'] = transacciones['total'].astype('float32')
+    transacciones['cantidad'] = pd.to_numeric(transacciones['cantidad'], downcast='integer')
+    clientes['latitud'] = clientes['latitud'].astype('float32')
+    clientes['longitud'] = clientes['longitud'].astype('float32')
+
+    # Precio unitario precalculado: el gráfico de dispersión lo usa tal
+    # cual y así no copia ni divide el frame filtrado en cada rerun
+    transacciones['precio'] = (transacciones['total'] / transacciones['cantidad']).astype('float32')
 
     datos_comb = pd.merge(transacciones, productos, on = 'producto_id', how='left')
     datos_comb = pd.merge(datos_comb, clientes, on='cliente_id', how='left')
 
-    return datos_comb, clientes
+    # Normalización de texto: con el caché esto corre una sola vez por proceso
+    datos_comb['categoria'] = datos_comb['categoria'].str.strip().str.title()
+    datos_comb['segmento'] = datos_comb['segmento'].str.strip().str.title()
+    datos_comb['metodo_pago'] = datos_comb['metodo_pago'].str.strip().str.title()
+
+    # Columnas de baja cardinalidad como category: los filtros isin y los
+    # groupby comparan códigos enteros en lugar de strings
+    for columna in ['categoria', 'segmento', 'metodo_pago', 'ciudad']:
+        datos_comb[columna] = datos_comb[columna].astype('category')
+
+    # Ordenar por fecha: el filtro de rango se resuelve luego con dos
+    # búsquedas binarias (searchsorted) en lugar de comparar fila a fila
+    datos_comb.sort_values('fecha', inplace=True)
+    datos_comb.reset_index(drop=True, inplace=True)
+
+    # Opciones de la barra lateral, calculadas una sola vez con los datos:
+    # dependen solo del df inmutable, no de la interacción
+    opciones = {
+        'categorias': datos_comb['categoria'].cat.categories.tolist(),
+        'segmentos': datos_comb['segmento'].cat.categories.tolist(),
+        'metodos_pago': datos_comb['metodo_pago'].cat.categories.tolist(),
+        'fecha_min': datos_comb['fecha'].iloc[0].date(),   # El df ya está ordenado
+        'fecha_max': datos_comb['fecha'].iloc[-1].date(),
+    }
+
+    return datos_comb, clientes, opciones
+
+# Filtrado cacheado: Streamlit hashea los argumentos (tuplas) y solo
+# recalcula cuando cambia alguna selección de la barra lateral
+@st.cache_data(show_spinner=False)
+def filtrar_datos(rango_fechas, categorias, segmentos, metodos):
+    """
+    Aplica los filtros seleccionados sobre el df combinado.
+    Como el df viene ordenado por fecha, el rango se reduce a un
+    slice encontrado en O(log N), sin materializar .dt.date
+    """
+    df, _, _ = load_data()
+
+    lo, hi = df['fecha'].searchsorted([
+        pd.Timestamp(rango_fechas[0]),
+        pd.Timestamp(rango_fechas[1]) + pd.Timedelta(days=1)
+    ])
+    df_fechas = df.iloc[lo:hi]
+
+    # Las máscaras se combinan in-place (&=) para no alojar arreglos temporales
+    condicion_filtro = df_fechas['categoria'].isin(categorias).to_numpy(copy=True)
+    condicion_filtro &= df_fechas['segmento'].isin(segmentos).to_numpy()
+    condicion_filtro &= df_fechas['metodo_pago'].isin(metodos).to_numpy()
+
+    # Sin .copy(): el resultado solo se lee, nunca se muta
+    return df_fechas.loc[condicion_filtro]
+
+@st.cache_data(show_spinner=False)
+def calcular_agregados(rango_fechas, categorias, segmentos, metodos):
+    """
+    Calcula todos los agregados que alimentan los KPIs, el mapa y los
+    gráficos. Cacheado por combinación de filtros: repetir una selección
+    ya vista no ejecuta ningún groupby.
+    """
+    df_filtrado = filtrar_datos(rango_fechas, categorias, segmentos, metodos)
+    _, df_clientes, _ = load_data()
+
+    # Conversión única a Polars (vía Arrow, sin copiar los datos): sus
+    # agregaciones corren multi-hilo sobre memoria columnar
+    lazy = pl.from_pandas(df_filtrado).set_sorted('fecha').lazy()
+
+    # Las agregaciones por cliente y el top 10 se declaran perezosas y se
+    # recolectan juntas: collect_all comparte el escaneo del frame
+    consulta_ubicacion = lazy.group_by('cliente_id').agg(
+        pl.col('total').sum().alias('ventas_totales'),
+        pl.len().alias('num_transacciones')
+    )
+    # top_k hace una selección parcial O(N) de los 10 mayores en lugar de
+    # ordenar todos los productos; solo las 10 filas finales se ordenan
+    consulta_top = lazy.group_by('nombre_x').agg(
+        pl.col('cantidad').sum()
+    ).top_k(10, by='cantidad').sort('cantidad', descending=True)
+
+    ventas_por_ubicacion, top_productos = [
+        resultado.to_pandas() for resultado in pl.collect_all([
+            consulta_ubicacion, consulta_top
+        ])
+    ]
+    top_productos = top_productos.rename(columns={'nombre_x': 'Producto'})
+
+    # Sumas por categoría, segmento, método de pago y mes en una sola
+    # pasada: el kernel de Numba recorre los códigos enteros una vez en
+    # lugar de lanzar cuatro groupby sobre el mismo frame
+    codigos_cat = df_filtrado['categoria'].cat.codes.to_numpy()
+    codigos_seg = df_filtrado['segmento'].cat.codes.to_numpy()
+    codigos_pago = df_filtrado['metodo_pago'].cat.codes.to_numpy()
+    totales = df_filtrado['total'].to_numpy()
+
+    fechas_mes = df_filtrado['fecha'].to_numpy().astype('datetime64[M]')
+    mes_inicial = fechas_mes.min() if fechas_mes.size else np.datetime64(0, 'M')
+    indices_mes = (fechas_mes - mes_inicial).astype(np.int64)
+    n_meses = int(indices_mes.max()) + 1 if indices_mes.size else 0
+
+    suma_cat, suma_seg, suma_pago, suma_mes, conteo_mes = sumas_fusionadas(
+        codigos_cat, codigos_seg, codigos_pago, indices_mes, totales,
+        len(df_filtrado['categoria'].cat.categories),
+        len(df_filtrado['segmento'].cat.categories),
+        len(df_filtrado['metodo_pago'].cat.categories),
+        n_meses
+    )
+
+    datos_mensuales = pd.DataFrame({
+        'fecha': (mes_inicial + np.arange(n_meses)).astype('datetime64[ns]'),
+        'total': suma_mes,
+        'numero_transacciones': conteo_mes
+    })
+
+    # Solo las claves presentes en la selección, como hacía el groupby
+    ventas_por_categoria = pd.DataFrame({
+        'categoria': df_filtrado['categoria'].cat.categories,
+        'total': suma_cat
+    }).query('total > 0').reset_index(drop=True)
+    ventas_pago = pd.DataFrame({
+        'metodo_pago': df_filtrado['metodo_pago'].cat.categories,
+        'total': suma_pago
+    }).query('total > 0').reset_index(drop=True)
+    ventas_por_segmento = pd.DataFrame({
+        'segmento': df_filtrado['segmento'].cat.categories,
+        'total': suma_seg
+    }).query('total > 0').reset_index(drop=True)
+
+    # La tasa de retención indica qué porcentaje de clientes realizaron más de una compra en el período seleccionado.
+    # bincount sobre códigos enteros densos: ni hash ni orden por frecuencia
+    codigos_cliente = pd.factorize(df_filtrado['cliente_id'])[0]
+    compras_por_cliente = np.bincount(codigos_cliente)
+    tasa_retencion = (compras_por_cliente > 1).mean() * 100
+
+    # Filtrar los clientes presentes en la selección
+    df_clientes_filtrado = df_clientes[
+        df_clientes['cliente_id'].isin(df_filtrado['cliente_id'].unique())
+    ]
+
+    # Unir el df de clientes con las ventas por ubicación
+    df_clientes_geo = pd.merge(
+        df_clientes_filtrado,
+        ventas_por_ubicacion,
+        on='cliente_id',
+        how='left'
+    )
+
+    # Agrupar por coordenadas únicas que se encuentran en el dataframe de clientes, con las métricas calculadas.
+    # observed=True y sort=False: solo los grupos presentes y sin ordenar
+    # claves que nadie consume ordenadas
+    coordenadas_unicas = df_clientes_geo.groupby(
+        ['latitud', 'longitud', 'ciudad'], observed=True, sort=False
+    ).agg({
+        'cliente_id': 'count',
+        'ventas_totales': 'sum',
+        'num_transacciones': 'sum'
+    }).reset_index().rename(columns={
+        'cliente_id': 'conteo_clientes'
+    })
+
+    # Segmento más frecuente por ubicación, vectorizado: contar por
+    # (ubicación, segmento), ordenar por frecuencia y quedarse con el
+    # primero de cada ubicación — sin lambda ni doble .mode() por grupo
+    segmento_principal = (
+        df_clientes_geo.groupby(['latitud', 'longitud', 'ciudad', 'segmento'],
+                                observed=True, sort=False)
+        .size().reset_index(name='n')
+        .sort_values('n', ascending=False)
+        .drop_duplicates(['latitud', 'longitud', 'ciudad'])
+        [['latitud', 'longitud', 'ciudad', 'segmento']]
+        .rename(columns={'segmento': 'segmento_principal'})
+    )
+    coordenadas_unicas = pd.merge(
+        coordenadas_unicas,
+        segmento_principal,
+        on=['latitud', 'longitud', 'ciudad'],
+        how='left'
+    )
+    coordenadas_unicas['segmento_principal'] = coordenadas_unicas['segmento_principal'].fillna('N/A')
+
+    return {
+        # Suma de las sumas por categoría: acumulada en float64 y sin otro escaneo
+        'ventas_totales': suma_cat.sum(),
+        'datos_mensuales': datos_mensuales,
+        'ventas_mensuales': datos_mensuales['total'].mean(),
+        'clientes_unicos': compras_por_cliente.size,
+        'tasa_retencion': tasa_retencion,
+        'coordenadas_unicas': coordenadas_unicas,
+        'ventas_por_categoria': ventas_por_categoria,
+        'ventas_pago': ventas_pago,
+        'ventas_por_segmento': ventas_por_segmento,
+        'top_productos': top_productos,
+    }
 
 # Configuración de la página
 st.set_page_config(
@@ -43,19 +301,15 @@ st.set_page_config(
 )
 
 # Carga inicial de datos
-df, df_clientes = load_data()
-
-df['categoria'] = df['categoria'].str.strip().str.lower().apply(capwords)
-df['segmento'] = df['segmento'].str.strip().str.lower().apply(capwords)
-df['metodo_pago'] = df['metodo_pago'].str.strip().str.lower().apply(capwords)
+df, df_clientes, opciones = load_data()
 
 # Barra lateral con los filtros interactivos
 with st.sidebar:
     st.header("Filtros")
 
-    # Selector de rango de fechas
-    fecha_min = df['fecha'].min().date()
-    fecha_max = df['fecha'].max().date()
+    # Selector de rango de fechas (límites precalculados en load_data)
+    fecha_min = opciones['fecha_min']
+    fecha_max = opciones['fecha_max']
 
     fechas_seleccionadas = st.date_input(
         label = "Rango de fechas",
@@ -65,8 +319,8 @@ with st.sidebar:
         help = "Selecciona el período a analizar"
     )
 
-    # Selector de categorías
-    categorias_disponibles = sorted(df['categoria'].unique())
+    # Selector de categorías (las categorías del dtype ya vienen ordenadas)
+    categorias_disponibles = opciones['categorias']
 
     categorias_seleccionadas = st.multiselect(
         label = "Categorías de productos",
@@ -76,7 +330,7 @@ with st.sidebar:
     )
 
     # Filtro por segmento de clientes
-    segmentos = sorted(df['segmento'].unique())
+    segmentos = opciones['segmentos']
 
     segmentos_seleccionados = st.multiselect(
         label = "Segmentos de clientes",
@@ -85,8 +339,8 @@ with st.sidebar:
         help = "Filtra por segmentos de clientes"
     )
 
-    # Filtro por métodos de pago
-    metodos_disponibles = sorted(df['metodo_pago'].dropna().unique())
+    # Filtro por métodos de pago (las categorías excluyen los NaN)
+    metodos_disponibles = opciones['metodos_pago']
 
     metodo_pago_seleccionado = st.multiselect(
         label = "Método de Pago",
@@ -95,17 +349,16 @@ with st.sidebar:
         help = "Filtra por método de pago utilizado en las transacciones"
     )
 
-# Aplicación de filtros
-condicion_filtro = (
-    (df['fecha'].dt.date >= fechas_seleccionadas[0]) &
-    (df['fecha'].dt.date <= fechas_seleccionadas[1]) &
-    (df['categoria'].isin(categorias_seleccionadas)) &
-    (df['segmento'].isin(segmentos_seleccionados)) &
-    (df['metodo_pago'].isin(metodo_pago_seleccionado))
+# Aplicación de filtros: tuplas hasheables que sirven de clave de caché
+filtros = (
+    (fechas_seleccionadas[0], fechas_seleccionadas[1]),
+    tuple(categorias_seleccionadas),
+    tuple(segmentos_seleccionados),
+    tuple(metodo_pago_seleccionado),
 )
 
-# Aplicar filtros
-df_filtrado = df[condicion_filtro].copy()
+df_filtrado = filtrar_datos(*filtros)
+agregados = calcular_agregados(*filtros)
 
 # Sección principal del dasboard, primero los kpis
 st.title("Dashboard de Ventas")
@@ -117,16 +370,12 @@ st.markdown("""
 # KPIS Principales
 st.header("Métricas clave")
 
-# Cálculo de métricas
-ventas_totales = df_filtrado['total'].sum()                   # Sumar las ventas totales
-ventas_mensuales = df_filtrado.groupby(                       # Suma de las ventas totales pero ahora por mes
-    pd.Grouper(key='fecha', freq='ME')
-)['total'].sum().mean()
-clientes_unicos = df_filtrado['cliente_id'].nunique()         # ID's de clientes únicos
-
-# La tasa de retención indica qué porcentaje de clientes realizaron más de una compra en el período seleccionado.
-compras_por_cliente = df_filtrado['cliente_id'].value_counts()
-tasa_retencion = (compras_por_cliente > 1).mean() * 100
+# Métricas ya calculadas (y cacheadas) por calcular_agregados
+ventas_totales = agregados['ventas_totales']
+datos_mensuales = agregados['datos_mensuales']
+ventas_mensuales = agregados['ventas_mensuales']
+clientes_unicos = agregados['clientes_unicos']
+tasa_retencion = agregados['tasa_retencion']
 
 # Mostrar métricas
 col1, col2, col3, col4 = st.columns(4)
@@ -158,19 +407,9 @@ with col4:
         help="Porcentaje de clientes con más de una compra"
     )
 
-# Gráficos de tendencias
+# Gráficos de tendencias (reutiliza el agregado mensual calculado arriba)
 st.header("Tendencia mensual de ventas")
 
-# Agrupar los datos por fecha con una frecuencia de mes, calculado el total (sum) y la cantidad de transacciones
-datos_mensuales = df_filtrado.groupby(
-    pd.Grouper(key='fecha', freq='ME')
-).agg({
-    'total':'sum',
-    'transaccion_id':'count'
-}).rename(columns={
-    'transaccion_id':'numero_transacciones'
-}).reset_index()
-
 fig = px.area(
     datos_mensuales,
     x='fecha',
@@ -189,8 +428,8 @@ fig.update_traces(
     '<b>Ventas:</b> $%{y:,.2f}<br>' +
     '<b>Número de transacciones:</b> %{customdata[0]:,}<extra></extra>',
     customdata=datos_mensuales[['numero_transacciones']].to_numpy(),
+    mode='lines',   # Solo línea: sin un marcador SVG por punto
     line=dict(width=2.5),
-    marker=dict(size=8),
     fill='tozeroy',
     fillcolor='rgba(100, 200, 150, 0.2)'
 )
@@ -203,41 +442,8 @@ fig.update_layout(
 
 st.plotly_chart(fig, use_container_width = True)
 
-# Parte gráfica del mapa
-
-# Hacer una copia del df de clientes y filtrarlo según lo que se vaya seleccionando
-df_clientes_geo = df_clientes.copy()
-df_clientes_filtrado = df_clientes[
-    df_clientes['cliente_id'].isin(df_filtrado['cliente_id'].unique())
-].copy()
-
-# Calcular las ventas por ciudad o ubicación, teniendo el total (sum) y la cantidad de transacciones ( datos para el popup)
-ventas_por_ubicacion = df_filtrado.groupby('cliente_id').agg({
-    'total': 'sum',
-    'transaccion_id': 'count'
-}).rename(columns={
-    'total': 'ventas_totales',
-    'transaccion_id': 'num_transacciones'
-}).reset_index()
-
-# Unir el df de clientes con las ventas por ubicación
-df_clientes_geo = pd.merge(
-    df_clientes_filtrado,
-    ventas_por_ubicacion,
-    on='cliente_id',
-    how='left'
-)
-
-# Agrupar por coordenadas únicas que se encuentran en el dataframe de clientes, con las métricas calculadas.
-coordenadas_unicas = df_clientes_geo.groupby(['latitud', 'longitud', 'ciudad']).agg({
-    'cliente_id': 'count',
-    'ventas_totales': 'sum',
-    'num_transacciones': 'sum',
-    'segmento': lambda x: x.mode()[0] if not x.mode().empty else 'N/A'
-}).reset_index().rename(columns={
-    'cliente_id': 'conteo_clientes',
-    'segmento': 'segmento_principal'
-})
+# Parte gráfica del mapa, con las coordenadas agregadas ya cacheadas
+coordenadas_unicas = agregados['coordenadas_unicas']
 
 # Resumen estadístico de cantidad de ciudades, acá siempre van a ser 6 si no se meten más
 st.subheader("Resumen por Ubicación")
@@ -249,28 +455,51 @@ m = folium.Map(
     tiles='cartodbpositron'
 )
 
-marker_cluster = MarkerCluster().add_to(m)
-
-for _, row in coordenadas_unicas.iterrows():
-    # Métricas adicionales
-    avg_venta = row['ventas_totales'] / row['num_transacciones'] if row['num_transacciones'] > 0 else 0    # Cálculo promedio de ventas
-
-    folium.CircleMarker(
-        location=[row['latitud'], row['longitud']],
-        radius=5 + (row['conteo_clientes']/500),  # Tamaño del círculo
-        color='#3388ff',
-        fill=True,
-        fill_color=obtener_color(row['ventas_totales']),
-        popup=f"""
-            <b>Ciudad:</b> {row['ciudad']}<br>
-            <b>Clientes:</b> {row['conteo_clientes']}<br>
-            <b>Ventas totales:</b> ${row['ventas_totales']:,.2f}<br>
-            <b>Transacciones:</b> {row['num_transacciones']}<br>
-            <b>Ticket promedio:</b> ${avg_venta:,.2f}<br>
-            <b>Segmento principal:</b> {row['segmento_principal']}
-        """,
-        tooltip=f"{row['ciudad']} - {row['conteo_clientes']} clientes"
-    ).add_to(marker_cluster)
+# Popups, tooltips y estilos construidos de forma vectorizada, sin iterrows
+avg_venta = (
+    coordenadas_unicas['ventas_totales'] / coordenadas_unicas['num_transacciones']
+).where(coordenadas_unicas['num_transacciones'] > 0, 0)    # Cálculo promedio de ventas
+
+popups = (
+    "<b>Ciudad:</b> " + coordenadas_unicas['ciudad'].astype(str) + "<br>" +
+    "<b>Clientes:</b> " + coordenadas_unicas['conteo_clientes'].astype(str) + "<br>" +
+    "<b>Ventas totales:</b> $" + coordenadas_unicas['ventas_totales'].map('{:,.2f}'.format) + "<br>" +
+    "<b>Transacciones:</b> " + coordenadas_unicas['num_transacciones'].astype(str) + "<br>" +
+    "<b>Ticket promedio:</b> $" + avg_venta.map('{:,.2f}'.format) + "<br>" +
+    "<b>Segmento principal:</b> " + coordenadas_unicas['segmento_principal'].astype(str)
+)
+tooltips = (
+    coordenadas_unicas['ciudad'].astype(str) + " - " +
+    coordenadas_unicas['conteo_clientes'].astype(str) + " clientes"
+)
+radios = 5 + (coordenadas_unicas['conteo_clientes'] / 500)  # Tamaño del círculo
+colores = coordenadas_unicas['ventas_totales'].map(obtener_color)
+
+# Un solo lote de datos hacia Leaflet: el callback JS crea cada marcador
+datos_marcadores = list(zip(
+    coordenadas_unicas['latitud'].tolist(),
+    coordenadas_unicas['longitud'].tolist(),
+    popups.tolist(),
+    colores.tolist(),
+    radios.tolist(),
+    tooltips.tolist()
+))
+
+callback_marcador = """
+function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: row[4],
+        color: '#3388ff',
+        fill: true,
+        fillColor: row[3]
+    });
+    marker.bindPopup(row[2]);
+    marker.bindTooltip(row[5]);
+    return marker;
+}
+"""
+
+FastMarkerCluster(datos_marcadores, callback=callback_marcador).add_to(m)
 
 st_folium(m, use_container_width = True, height=500)
 
@@ -281,61 +510,55 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     # Gráfico de pastel de ventas por categoría
-    ventas_por_categoria = df_filtrado.groupby('categoria')['total'].sum().reset_index()
+    ventas_por_categoria = agregados['ventas_por_categoria']
 
-    fig_torta = px.pie(
-        ventas_por_categoria,
-        names='categoria',
-        values='total',
-        title='Distribución de Ventas por Categoría',
+    # go.Pie con arreglos numpy: se evita la conversión pandas→dict de px
+    # y el JSON enviado al navegador es más pequeño
+    fig_torta = go.Figure(go.Pie(
+        labels=ventas_por_categoria['categoria'].to_numpy(),
+        values=ventas_por_categoria['total'].to_numpy(),
         hole=0.3,
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
-
-    fig_torta.update_traces(
+        marker=dict(colors=px.colors.qualitative.Set3),
         hovertemplate='<b>Categoría:</b> %{label}<br><b>Total:</b> $%{value:,.2f}<extra></extra>'
-    )
+    ))
+    fig_torta.update_layout(title='Distribución de Ventas por Categoría')
 
     st.plotly_chart(fig_torta, use_container_width=True)
 
 with col2:
     # Gráfico de pastel de ventas por método de pago
-    ventas_pago = df_filtrado.groupby('metodo_pago')['total'].sum().reset_index()
+    ventas_pago = agregados['ventas_pago']
 
-    fig_pago = px.pie(
-        ventas_pago,
-        names='metodo_pago',
-        values='total',
-        title='Distribución por Método de Pago',
+    fig_pago = go.Figure(go.Pie(
+        labels=ventas_pago['metodo_pago'].to_numpy(),
+        values=ventas_pago['total'].to_numpy(),
         hole=0.3,
-        color_discrete_sequence=px.colors.qualitative.Set3
-    )
-
-    fig_pago.update_traces(
-        hovertemplate='<b>Metodo de pago:</b> %{x}<br><b>Total:</b> $%{y:,.2f}<extra></extra>'
-    )
+        marker=dict(colors=px.colors.qualitative.Set3),
+        hovertemplate='<b>Metodo de pago:</b> %{label}<br><b>Total:</b> $%{value:,.2f}<extra></extra>'
+    ))
+    fig_pago.update_layout(title='Distribución por Método de Pago')
 
     st.plotly_chart(fig_pago, use_container_width=True)
 
 with col3:
     # Gráfico de barras por segmento de cliente
-    ventas_por_segmento = df_filtrado.groupby('segmento')['total'].sum().reset_index()
+    ventas_por_segmento = agregados['ventas_por_segmento']
 
-    fig_segmento = px.bar(
-        ventas_por_segmento.sort_values('total', ascending=False),
-        x='segmento',
-        y='total',
-        title='Ventas por Segmento de Cliente',
-        labels={'segmento': 'Segmento', 'total': 'Total'},
-        color='segmento',
-        color_discrete_sequence=px.colors.qualitative.Pastel
-    )
+    orden_segmentos = ventas_por_segmento.sort_values('total', ascending=False)
 
-    fig_segmento.update_traces(
+    fig_segmento = go.Figure(go.Bar(
+        x=orden_segmentos['segmento'].to_numpy(),
+        y=orden_segmentos['total'].to_numpy(),
+        marker_color=px.colors.qualitative.Pastel[:len(orden_segmentos)],
         hovertemplate='<b>Segmento:</b> %{x}<br><b>Total:</b> $%{y:,.2f}<extra></extra>'
-    )
+    ))
 
-    fig_segmento.update_layout(showlegend=False)
+    fig_segmento.update_layout(
+        title='Ventas por Segmento de Cliente',
+        xaxis_title='Segmento',
+        yaxis_title='Total',
+        showlegend=False
+    )
     st.plotly_chart(fig_segmento, use_container_width=True)
 
 col_extra = st.container()
@@ -343,12 +566,15 @@ col_extra = st.container()
 with col_extra:
     col1, col2 = st.columns(2)
     with col1:
-        df_precios = df_filtrado.copy()
-        df_precios['precio'] = df_precios['total'] / df_precios['cantidad']
-        df_precios = df_precios.rename(columns={'nombre_x': 'Producto'})
+        # Submuestreo determinista: por encima de ~15k puntos el navegador
+        # ya no distingue nada nuevo y Plotly se ahoga renderizándolos
+        n_puntos = 15000
+        df_dispersion = df_filtrado if len(df_filtrado) <= n_puntos \
+            else df_filtrado.sample(n=n_puntos, random_state=0)
 
+        # El precio unitario ya viene precalculado desde load_data
         fig_precio_cantidad = px.scatter(
-            df_precios,
+            df_dispersion.rename(columns={'nombre_x': 'Producto'}),
             x='precio',
             y='cantidad',
             color='categoria',
@@ -359,32 +585,35 @@ with col_extra:
                 'categoria': 'Categoría'
             },
             title='Relación entre Precio Unitario y Cantidad Vendida',
-            color_discrete_sequence=px.colors.qualitative.Vivid
+            color_discrete_sequence=px.colors.qualitative.Vivid,
+            render_mode='webgl'
         )
 
         fig_precio_cantidad.update_traces(marker=dict(size=8, opacity=0.6))
         st.plotly_chart(fig_precio_cantidad, use_container_width=True)
 
     with col2:
-        # Top 10 de los productos más vendidos
-        top_productos = df_filtrado.groupby('nombre_x')['cantidad'].sum().nlargest(10).reset_index() # Se agrupa por producto y se obtienen los 10 primeros
-        top_productos = top_productos.rename(columns={'nombre_x': 'Producto'})
+        # Top 10 de los productos más vendidos (ya agregado y cacheado)
+        top_productos = agregados['top_productos']
 
-        fig_top_prod = px.bar(
-            top_productos,
-            x='Producto',
-            y='cantidad',
-            title='Top 10 Productos Más Vendidos',
-            labels={'nombre': 'Producto', 'cantidad': 'Cantidad Vendida'},
-            color='Producto',
-            color_discrete_sequence=px.colors.qualitative.Set2
-        )
+        # Paleta repetida hasta cubrir las 10 barras, como hacía px con color='Producto'
+        paleta = px.colors.qualitative.Set2
+        colores_top = (paleta * (len(top_productos) // len(paleta) + 1))[:len(top_productos)]
 
-        fig_top_prod.update_traces(
+        fig_top_prod = go.Figure(go.Bar(
+            x=top_productos['Producto'].to_numpy(),
+            y=top_productos['cantidad'].to_numpy(),
+            marker_color=colores_top,
             hovertemplate='<b>Producto:</b> %{x}<br><b>Cantidad:</b> $%{y:,.2f}<extra></extra>'
-        )
+        ))
 
-        fig_top_prod.update_layout(showlegend=False, xaxis_tickangle=-45)
+        fig_top_prod.update_layout(
+            title='Top 10 Productos Más Vendidos',
+            xaxis_title='Producto',
+            yaxis_title='Cantidad Vendida',
+            showlegend=False,
+            xaxis_tickangle=-45
+        )
         st.plotly_chart(fig_top_prod, use_container_width=True)
 
 st.header("Explorador de Datos")